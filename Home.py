@@ -2,8 +2,7 @@
 # It sets up the session state, loads environment variables, configures logging, and displays the project title along 
 # with the group members involved in the project.
 
-from dotenv import load_dotenv
-load_dotenv()
+import config  # noqa: F401  (loads the .env file once for the whole app)
 
 from project_logging import logging_module
 
@@ -18,5 +17,4 @@ st.header("Group Members", divider="gray")
 
 members = ["Pragnesh Anekal", "Ram Kumar Ramasamy Pandiaraj", "Dipen Patel", "Ramy Solanki"]
 
-for i in range(len(members)):
-    st.markdown(str(i+1) + ". " + members[i])
\ No newline at end of file
+st.markdown("\n".join(f"{i}. {member}" for i, member in enumerate(members, 1)))
\ No newline at end of file
@@ -0,0 +1,28 @@
+# This Python script centralizes the application's configuration. It loads the .env file exactly once
+# at import time and exposes the environment-derived credentials and connection details through a frozen
+# `Settings` dataclass, so the rest of the application imports typed settings instead of each module
+# re-running `load_dotenv()` and `os.getenv()` on every import.
+
+import os
+from dataclasses import dataclass, field
+from dotenv import load_dotenv
+
+# Load environment variables once for the whole process
+load_dotenv()
+
+@dataclass(frozen=True)
+class Settings:
+    """
+    Immutable container for all environment-derived configuration values.
+    """
+    hugging_face_token: str = field(default_factory=lambda: os.getenv('HUGGINGFACE_TOKEN'))
+    aws_access_key_id: str = field(default_factory=lambda: os.getenv('AWS_ACCESS_KEY_ID'))
+    aws_secret_access_key: str = field(default_factory=lambda: os.getenv('AWS_SECRET_ACCESS_KEY'))
+    aws_bucket_name: str = field(default_factory=lambda: os.getenv('AWS_S3_BUCKET_NAME'))
+    aws_rds_host: str = field(default_factory=lambda: os.getenv('AWS_RDS_HOST'))
+    aws_rds_user: str = field(default_factory=lambda: os.getenv('AWS_RDS_USERNAME'))
+    aws_rds_password: str = field(default_factory=lambda: os.getenv('AWS_RDS_PASSWORD'))
+    aws_rds_port: str = field(default_factory=lambda: os.getenv('AWS_RDS_DB_PORT'))
+    aws_rds_database: str = field(default_factory=lambda: os.getenv('AWS_RDS_DATABASE'))
+
+settings = Settings()
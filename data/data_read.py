@@ -4,17 +4,25 @@
 # logging module, ensuring that data fetching operations are monitored and recorded for debugging and auditing purposes.
 
 import mysql.connector
+import orjson
 import pandas as pd
+import streamlit as st
 from data.db_connection import get_db_connection
 from datetime import datetime
 from project_logging import logging_module
 
+@st.cache_data(ttl=3600, show_spinner=False)
 def fetch_data_from_db() -> pd.DataFrame:
     """
     Fetches data from the 'gaia_metadata_tbl' table in the MySQL database and returns it as a pandas DataFrame.
+    The result is cached for an hour so Streamlit reruns reuse the in-memory DataFrame instead of re-querying MySQL.
 
     Returns:
-        pd.DataFrame: A DataFrame containing the data fetched from the database, or None if an error occurs.
+        pd.DataFrame: A DataFrame containing the data fetched from the database.
+
+    Raises:
+        Exception: Re-raised on any fetch failure, so st.cache_data does not cache
+                   the error and the next rerun retries the query.
     """
     try:
         # Connect to MySQL database
@@ -40,15 +48,36 @@ def fetch_data_from_db() -> pd.DataFrame:
             # Store the fetched data into a pandas DataFrame
             df = pd.DataFrame(myresult, columns=columns)
 
+            # Normalize the extension casing once at load so filters can
+            # compare without lowering it on every interaction; both columns
+            # are low-cardinality, so store them as categoricals for cheap
+            # equality masks and groupbys
+            df['file_extension'] = df['file_extension'].str.lower().astype('category')
+            df['Level'] = df['Level'].astype('category')
+
+            # Parse the Annotator Metadata JSON once at load; the UI only
+            # needs the Steps text, not a parse per button click
+            df['steps_text'] = df['Annotator Metadata'].map(
+                lambda metadata: orjson.loads(metadata).get('Steps', 'No steps found') if metadata else 'No steps found')
+
+            # Index by task_id (keeping the column for positional consumers)
+            # so joins and task lookups reuse the prebuilt sorted index
+            df.set_index('task_id', drop=False, inplace=True)
+            df.sort_index(inplace=True)
+
             return df
 
+        # A connection that fails the liveness check must raise as well,
+        # so st.cache_data never caches the failed fetch
+        raise mysql.connector.Error("Database connection is not available.")
+
     except mysql.connector.Error as e:
         logging_module.log_error(f"Database error occurred: {e}")
-        return None
+        raise
 
     except Exception as e:
         logging_module.log_error(f"An unexpected error occurred: {e}")
-        return None
+        raise
 
     finally:
         # Ensure that the cursor and connection are properly closed
@@ -60,12 +89,18 @@ def fetch_data_from_db() -> pd.DataFrame:
         except Exception as e:
             logging_module.log_error(f"Error closing the MySQL connection: {e}")
 
+@st.cache_data(ttl=300, show_spinner=False)
 def fetch_data_from_db_dashboards() -> pd.DataFrame:
     """
     Fetches data from the 'model_response' table in the MySQL database and returns it as a pandas DataFrame.
+    The result is cached briefly so dashboard widget interactions do not re-query MySQL on every rerun.
 
     Returns:
-        pd.DataFrame: A DataFrame containing the data fetched from the 'model_response' table, or None if an error occurs.
+        pd.DataFrame: A DataFrame containing the data fetched from the 'model_response' table.
+
+    Raises:
+        Exception: Re-raised on any fetch failure, so st.cache_data does not cache
+                   the error and the next rerun retries the query.
     """
     try:
         # Connect to MySQL database
@@ -89,14 +124,22 @@ def fetch_data_from_db_dashboards() -> pd.DataFrame:
             # Store the fetched data into a pandas DataFrame
             df_dashboards = pd.DataFrame(myresult, columns=columns)
 
+            # model_used repeats a handful of values, so a categorical keeps
+            # the merge and groupby paths on integer codes
+            df_dashboards['model_used'] = df_dashboards['model_used'].astype('category')
+
             return df_dashboards
 
+        # A connection that fails the liveness check must raise as well,
+        # so st.cache_data never caches the failed fetch
+        raise mysql.connector.Error("Database connection is not available.")
+
     except mysql.connector.Error as e:
         logging_module.log_error(f"Database error occurred: {e}")
-        return None
+        raise
     except Exception as e:
         logging_module.log_error(f"An unexpected error occurred: {e}")
-        return None
+        raise
 
     finally:
         # Ensure that the cursor and connection are properly closed
@@ -108,6 +151,69 @@ def fetch_data_from_db_dashboards() -> pd.DataFrame:
         except Exception as e:
             logging_module.log_error(f"Error closing the MySQL connection: {e}")
 
+@st.cache_data(ttl=60, show_spinner=False)
+def fetch_dashboard_aggregates() -> pd.DataFrame:
+    """
+    Fetches the per (model_used, Level, response_category) response counts, with the join
+    and GROUP BY pushed down to MySQL so only the aggregated rows cross the network.
+
+    Returns:
+        pd.DataFrame: A DataFrame with 'model_used', 'Level', 'response_category', and 'n' columns.
+
+    Raises:
+        Exception: Re-raised on any fetch failure, so st.cache_data does not cache
+                   the error and the next rerun retries the query.
+    """
+    try:
+        # Connect to MySQL database
+        mydb = get_db_connection()
+
+        if mydb.is_connected():
+            logging_module.log_success("Connected to the database for dashboard aggregates.")
+
+            # Create a cursor object for the aggregate query
+            mydata_aggregates = mydb.cursor()
+
+            # Aggregate the joined tables on the server instead of in pandas
+            mydata_aggregates.execute("""
+                SELECT mr.model_used, gm.Level, mr.response_category, COUNT(*) AS n
+                FROM model_response mr
+                JOIN gaia_metadata_tbl gm ON gm.task_id = mr.task_id
+                GROUP BY mr.model_used, gm.Level, mr.response_category
+            """)
+
+            # Fetch the aggregated rows
+            myresult = mydata_aggregates.fetchall()
+
+            # Get column names
+            columns = [col[0] for col in mydata_aggregates.description]
+
+            # Store the fetched data into a pandas DataFrame
+            df_aggregates = pd.DataFrame(myresult, columns=columns)
+
+            return df_aggregates
+
+        # A connection that fails the liveness check must raise as well,
+        # so st.cache_data never caches the failed fetch
+        raise mysql.connector.Error("Database connection is not available.")
+
+    except mysql.connector.Error as e:
+        logging_module.log_error(f"Database error occurred: {e}")
+        raise
+    except Exception as e:
+        logging_module.log_error(f"An unexpected error occurred: {e}")
+        raise
+
+    finally:
+        # Ensure that the cursor and connection are properly closed
+        try:
+            if mydb.is_connected():
+                mydata_aggregates.close()
+                mydb.close()
+                logging_module.log_success("MySQL connection closed.")
+        except Exception as e:
+            logging_module.log_error(f"Error closing the MySQL connection: {e}")
+
 def insert_model_response(task_id: str, date: datetime, model_used: str, model_response: str, response_category: str,
                           created_at: datetime = datetime.now(), created_by: str = 'streamlit user') -> None:
     """
@@ -4,10 +4,16 @@
 # and facilitates the seamless integration of S3 data within the application, with logging incorporated for monitoring purposes.
 
 import boto3
+import streamlit as st
+from botocore.config import Config
 from urllib.parse import urlparse, unquote
 import os
 import requests
+import shutil
 import tempfile
+import time
+from functools import lru_cache
+from config import settings
 from project_logging import logging_module
 
 # File Extensions
@@ -17,14 +23,23 @@ IMG_EXT = ['.jpg', '.png']
 ERR_EXT = ['.pdb', '.jsonld']
 MP3_EXT = ['.mp3']
 
-# AWS credentials
-aws_access_key_id = os.getenv('AWS_ACCESS_KEY_ID')
-aws_secret_access_key = os.getenv('AWS_SECRET_ACCESS_KEY')
+# Shared session so repeated downloads reuse pooled keep-alive connections
+http_session = requests.Session()
+http_session.mount('https://', requests.adapters.HTTPAdapter(pool_connections=20, pool_maxsize=20))
 
-# Initialize S3 client
-s3 = boto3.client('s3',
-                  aws_access_key_id=aws_access_key_id,
-                  aws_secret_access_key=aws_secret_access_key)
+@st.cache_resource
+def get_s3_client():
+    """
+    Creates the S3 client once per process and reuses it across Streamlit reruns.
+
+    Returns:
+        botocore.client.S3: A cached S3 client with a shared connection pool.
+    """
+    return boto3.client('s3',
+                        aws_access_key_id=settings.aws_access_key_id,
+                        aws_secret_access_key=settings.aws_secret_access_key,
+                        config=Config(max_pool_connections=50,
+                                      retries={'max_attempts': 3, 'mode': 'standard'}))
 
 def parse_s3_url(url: str) -> tuple:
     """
@@ -41,9 +56,28 @@ def parse_s3_url(url: str) -> tuple:
     object_key = parsed_url.path.lstrip('/')       # Extract object key
     return bucket_name, object_key
 
+@lru_cache(maxsize=1024)
+def sign_presigned_url(bucket_name: str, object_key: str, expiration: int, window: int) -> str:
+    """
+    Signs a pre-signed URL for an S3 object, memoized per 30-minute signing window.
+
+    Args:
+        bucket_name (str): The name of the S3 bucket.
+        object_key (str): The key of the S3 object.
+        expiration (int): The time in seconds until the pre-signed URL expires.
+        window (int): The current 30-minute window used to key the cache so URLs refresh before expiry.
+
+    Returns:
+        str: The pre-signed URL allowing temporary access to the S3 object.
+    """
+    return get_s3_client().generate_presigned_url('get_object',
+                                                  Params={'Bucket': bucket_name, 'Key': object_key},
+                                                  ExpiresIn=expiration)
+
 def generate_presigned_url(s3_url: str, expiration: int = 3600) -> str:
     """
-    Generates a pre-signed URL for an S3 object that allows temporary access.
+    Generates a pre-signed URL for an S3 object that allows temporary access. URLs are reused
+    for up to 30 minutes, well within their 1-hour validity, before being re-signed.
 
     Args:
         s3_url (str): The S3 URL of the object (e.g., 'https://bucket-name.s3.amazonaws.com/object-key').
@@ -53,17 +87,27 @@ def generate_presigned_url(s3_url: str, expiration: int = 3600) -> str:
         str: The pre-signed URL allowing temporary access to the S3 object, or None if an error occurs.
     """
     bucket_name, object_key = parse_s3_url(s3_url)
-    
+
     try:
-        # Generate pre-signed URL that expires in the given time (default: 1 hour)
-        presigned_url = s3.generate_presigned_url('get_object',
-                                                  Params={'Bucket': bucket_name, 'Key': object_key},
-                                                  ExpiresIn=expiration)
-        return presigned_url
+        # Reuse the signed URL within the current 30-minute window
+        return sign_presigned_url(bucket_name, object_key, expiration, int(time.time()) // 1800)
     except Exception as e:
         logging_module.log_error(f"Error generating pre-signed URL: {e}")
         return None
 
+@st.cache_data(show_spinner=False)
+def build_s3_url_lookup(df) -> dict:
+    """
+    Builds a dictionary mapping each Question to its S3 URL for O(1) lookups.
+
+    Args:
+        df (pd.DataFrame): The DataFrame containing the 'Question' and 's3_url' columns.
+
+    Returns:
+        dict: A dictionary keyed by Question with the corresponding S3 URL as the value.
+    """
+    return df.set_index('Question')['s3_url'].to_dict()
+
 def process_data_and_generate_url(question: str, df) -> str:
     """
     Fetches data from the database, extracts the S3 URL for the specified question, and generates a pre-signed URL if available.
@@ -76,10 +120,14 @@ def process_data_and_generate_url(question: str, df) -> str:
     """
     if df is not None:
         if 's3_url' in df.columns:
-            # Extract the S3 URL for the specified Question
-            matching_rows = df[df['Question'] == question]
-            if not matching_rows.empty:
-                s3_url_variable = matching_rows['s3_url'].values[0]
+            # Look up the S3 URL for the specified Question with a single hash probe
+            url_lookup = build_s3_url_lookup(df)
+            try:
+                s3_url_variable = url_lookup[question]
+            except KeyError:
+                logging_module.log_error("No matching Question found")
+                return "1"
+            else:
                 logging_module.log_success(f"S3 URL: {s3_url_variable}")
 
                 # Check if s3_url_variable is null
@@ -90,9 +138,6 @@ def process_data_and_generate_url(question: str, df) -> str:
                 else:
                     logging_module.log_success("No File is associated with this Question")
                     return "1"
-            else:
-                logging_module.log_error("No matching Question found")
-                return "1"
         else:
             logging_module.log_error("'s3_url' column not found in DataFrame")
             return "1"
@@ -118,15 +163,11 @@ def download_file(url: str) -> dict:
     filename = os.path.basename(path)
     extension = os.path.splitext(filename)[1]
     
-    # Create a temporary file with the correct extension
-    temp = tempfile.NamedTemporaryFile(delete=False, suffix=extension)
-    
-    # Get the file from the URL
-    response = requests.get(url)
-    response.raise_for_status()  # Check if the download was successful
-    
-    # Write the content to the temporary file
-    temp.write(response.content)
-    temp.close()  # Close the file to finalize writing
-    
+    # Stream the file from the URL straight into a temporary file so large
+    # downloads are never buffered fully in memory
+    with http_session.get(url, stream=True, timeout=30) as response:
+        response.raise_for_status()  # Check if the download was successful
+        with tempfile.NamedTemporaryFile(delete=False, suffix=extension) as temp:
+            shutil.copyfileobj(response.raw, temp, length=1024 * 1024)
+
     return {"url": url, "path": temp.name, "extension": extension}
\ No newline at end of file
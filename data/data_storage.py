@@ -4,37 +4,36 @@
 # interactions. Additionally, the script incorporates logging to monitor the storage operations, ensuring traceability
 # and error handling within the data storage processes.
 
-import os
+import asyncio
+import tempfile
+import aiohttp
 from datasets import load_dataset
 from huggingface_hub import login
-import json
+import orjson
 import boto3
-import requests
+from boto3.s3.transfer import TransferConfig
 from mysql.connector import Error
 from sqlalchemy import create_engine, text
-from db_connection import get_db_connection
-from dotenv import load_dotenv
-import data_storage_log as logging_module
+from config import settings
+from data.db_connection import get_db_connection
+from data import data_storage_log as logging_module
 
-# Load environment variables
-load_dotenv()
-
-# Getting environmental variables
-hugging_face_token = os.getenv('HUGGINGFACE_TOKEN')
-aws_access_key_id = os.getenv('AWS_ACCESS_KEY_ID')
-aws_secret_access_key = os.getenv('AWS_SECRET_ACCESS_KEY')
-aws_bucket_name = os.getenv('AWS_S3_BUCKET_NAME')
-aws_rds_host = os.getenv('AWS_RDS_HOST')
-aws_rds_user = os.getenv('AWS_RDS_USERNAME')
-aws_rds_password = os.getenv('AWS_RDS_PASSWORD')
-aws_rds_port = os.getenv('AWS_RDS_DB_PORT')
-aws_rds_database = os.getenv('AWS_RDS_DATABASE')
+# Environment-derived configuration (loaded once by config)
+hugging_face_token = settings.hugging_face_token
+aws_access_key_id = settings.aws_access_key_id
+aws_secret_access_key = settings.aws_secret_access_key
+aws_bucket_name = settings.aws_bucket_name
 
 
 # Creating an engine for connecting to the AWS RDS - MySQL database
 try:
-    connection_string = f'mysql+mysqlconnector://{aws_rds_user}:{aws_rds_password}@{aws_rds_host}:{aws_rds_port}'
-    engine = create_engine(connection_string)
+    connection_string = (f'mysql+mysqlconnector://{settings.aws_rds_user}:{settings.aws_rds_password}'
+                         f'@{settings.aws_rds_host}:{settings.aws_rds_port}')
+    engine = create_engine(connection_string,
+                           pool_size=10,
+                           max_overflow=20,
+                           pool_pre_ping=True,
+                           pool_recycle=1800)
     logging_module.log_success("MySQL connection engine created successfully.")
 except Exception as e:
     logging_module.log_error(f"Failed to create MySQL connection engine: {e}")
@@ -56,8 +55,9 @@ except Exception as e:
 # Convert the 'validation' split into a pandas DataFrame
 try:
     train_df = ds['validation'].to_pandas()
-    train_df['Annotator Metadata'] = train_df['Annotator Metadata'].apply(json.dumps)
-    train_df.to_sql(schema='bdia_team7_db', name='gaia_metadata_tbl', con=engine, if_exists='replace', index=False)
+    train_df['Annotator Metadata'] = train_df['Annotator Metadata'].map(lambda metadata: orjson.dumps(metadata).decode())
+    train_df.to_sql(schema='bdia_team7_db', name='gaia_metadata_tbl', con=engine, if_exists='replace', index=False,
+                    method='multi', chunksize=500)
     logging_module.log_success("GAIA dataset loaded into AWS RDS - bdia_team7_db successfully.")
 except Exception as e:
     logging_module.log_error(f"Error saving GAIA dataset to MySQL: {e}")
@@ -87,14 +87,81 @@ except Exception as e:
 # Hugging Face base URL for validation files
 huggingface_base_url = 'https://huggingface.co/datasets/gaia-benchmark/GAIA/resolve/main/2023/validation/'
 
+headers = {
+    "Authorization": f"Bearer {hugging_face_token}"
+}
+
+# Multipart transfer settings so large files stream to S3 in parallel 8 MB parts
+transfer_config = TransferConfig(multipart_threshold=8 * 1024 * 1024,
+                                 multipart_chunksize=8 * 1024 * 1024,
+                                 max_concurrency=8,
+                                 use_threads=True)
+
+async def ingest_record(record: dict, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore) -> tuple:
+    """
+    Downloads a single file from Hugging Face and uploads it to S3.
+
+    Args:
+        record (dict): A row from gaia_metadata_tbl containing 'task_id' and 'file_name'.
+        session (aiohttp.ClientSession): The shared session used for the Hugging Face download.
+        semaphore (asyncio.Semaphore): Bounds the number of in-flight transfers.
+
+    Returns:
+        tuple: A tuple of (s3_url, file_extension, task_id) on success, or None if the transfer failed.
+    """
+    task_id = record['task_id']
+    file_name = record['file_name'].strip()
+    file_extension = file_name.split('.')[-1]
+
+    # Download file from Hugging Face
+    file_url = huggingface_base_url + file_name
+    try:
+        async with semaphore:
+            async with session.get(file_url) as response:
+                if response.status != 200:
+                    logging_module.log_error(f"Failed to download {file_name}: HTTP {response.status}")
+                    return None
+
+                # Spool the download to a temporary file (disk-backed past 8 MB)
+                # so memory stays bounded regardless of file size
+                with tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024) as spool:
+                    async for chunk in response.content.iter_chunked(1024 * 1024):
+                        spool.write(chunk)
+                    logging_module.log_success(f"Downloaded {file_name} from Hugging Face.")
+
+                    # boto3 is synchronous, so run the multipart upload in a
+                    # worker thread to keep the event loop free
+                    spool.seek(0)
+                    s3_key = f"gaia_files/{file_name}"
+                    await asyncio.get_running_loop().run_in_executor(
+                        None, lambda: s3.upload_fileobj(spool, aws_bucket_name, s3_key, Config=transfer_config))
+
+                s3_url = f"https://{aws_bucket_name}.s3.amazonaws.com/{s3_key}"
+                logging_module.log_success(f"Uploaded {file_name} to S3 at {s3_url}")
+                return (s3_url, file_extension, task_id)
+    except aiohttp.ClientError as e:
+        logging_module.log_error(f"Error downloading {file_name}: {e}")
+    return None
+
+async def ingest_records(records: list) -> list:
+    """
+    Ingests all records concurrently over one keep-alive aiohttp session.
+
+    Args:
+        records (list): The rows from gaia_metadata_tbl that have a file to transfer.
+
+    Returns:
+        list: The successful (s3_url, file_extension, task_id) tuples.
+    """
+    semaphore = asyncio.Semaphore(32)
+    async with aiohttp.ClientSession(headers=headers, timeout=aiohttp.ClientTimeout(total=300)) as session:
+        results = await asyncio.gather(*[ingest_record(record, session, semaphore) for record in records])
+    return [result for result in results if result]
+
 # Connect to MySQL RDS and fetch records where file_name is not null
 try:
     connection = get_db_connection()
 
-    headers = {
-        "Authorization": f"Bearer {hugging_face_token}"
-    }
-
     if connection.is_connected():
         cursor = connection.cursor(dictionary=True)
 
@@ -104,53 +171,22 @@ try:
         records = cursor.fetchall()
         logging_module.log_success(f"Fetched records from bdia_team7_db.gaia_metadata_tbl.")
 
-        for record in records:
-            task_id = record['task_id']
-            file_name = record['file_name'].strip()
+        # Download/upload the files concurrently; the loop is I/O bound so the
+        # event loop overlaps the Hugging Face and S3 network calls
+        updates = asyncio.run(ingest_records(records))
 
-            # Download file from Hugging Face
-            file_url = huggingface_base_url + file_name
+        # Update the original RDS records with the S3 URL and file extension in
+        # a single batched statement and one commit
+        if updates:
             try:
-                response = requests.get(file_url, headers=headers)
-                if response.status_code == 200:
-                    file_data = response.content
-                    logging_module.log_success(f"Downloaded {file_name} from Hugging Face.")
-
-                    # Upload the file to S3
-                    s3_key = f"gaia_files/{file_name}"
-                    s3.put_object(Bucket=aws_bucket_name, Key=s3_key, Body=file_data)
-                    s3_url = f"https://{aws_bucket_name}.s3.amazonaws.com/{s3_key}"
-                    logging_module.log_success(f"Uploaded {file_name} to S3 at {s3_url}")
-
-                    # Update the original RDS record with the S3 URL
-                    try:
-                        update_s3url_query = """UPDATE bdia_team7_db.gaia_metadata_tbl
-                                                SET s3_url = %s
-                                                WHERE task_id = %s"""
-                        cursor.execute(update_s3url_query, (s3_url, task_id))
-                        connection.commit()
-                        logging_module.log_success(f"Updated record {task_id} with S3 URL.")
-                    except Exception as e:
-                        logging_module.log_error(f"Error updating S3 URL for task_id {task_id}: {e}")
-
-                    # Update the original RDS record with the file extension
-                    try:
-                        update_file_ext_query = """
-                            UPDATE bdia_team7_db.gaia_metadata_tbl
-                            SET file_extension = SUBSTRING_INDEX(file_name, '.', -1)
-                            WHERE task_id = %s
-                        """
-                        cursor.execute(update_file_ext_query, (task_id,))
-                        connection.commit()
-                        logging_module.log_success(f"Updated record {task_id} with file extension.")
-                    except Exception as e:
-                        logging_module.log_error(f"Error updating file extension for task_id {task_id}: {e}")
-
-                else:
-                    logging_module.log_error(f"Failed to download {file_name}: HTTP {response.status_code}")
-
-            except requests.exceptions.RequestException as e:
-                logging_module.log_error(f"Error downloading {file_name}: {e}")
+                update_query = """UPDATE bdia_team7_db.gaia_metadata_tbl
+                                  SET s3_url = %s, file_extension = %s
+                                  WHERE task_id = %s"""
+                cursor.executemany(update_query, updates)
+                connection.commit()
+                logging_module.log_success(f"Updated {len(updates)} records with S3 URL and file extension.")
+            except Exception as e:
+                logging_module.log_error(f"Error updating S3 URLs and file extensions: {e}")
 
 except Error as e:
     logging_module.log_error(f"Error while connecting to MySQL: {e}")
@@ -1,31 +1,30 @@
-# This Python script establishes a connection to an AWS RDS MySQL database using environment variables for 
-# credentials and connection details. It securely loads these variables using the `dotenv` package and 
-# defines a function `get_db_connection()` to create and return a connection object, facilitating database 
-# interactions within the application.
+# This Python script establishes a connection to an AWS RDS MySQL database using the credentials and
+# connection details exposed by the central `config.Settings` object. It defines a function
+# `get_db_connection()` to create and return a connection object, facilitating database interactions
+# within the application. Connections are drawn from a shared SQLAlchemy pool so repeated calls reuse
+# established TCP/TLS sessions instead of reconnecting each time.
 
-import os
-import mysql.connector
-from dotenv import load_dotenv
-load_dotenv()
+from sqlalchemy import create_engine
+from sqlalchemy.pool import PoolProxiedConnection
+from config import settings
 
-# Getting in Environmental variables
-aws_rds_host=os.getenv('AWS_RDS_HOST')
-aws_rds_user=os.getenv('AWS_RDS_USERNAME')
-aws_rds_password=os.getenv('AWS_RDS_PASSWORD')
-aws_rds_port =os.getenv('AWS_RDS_DB_PORT')
-aws_rds_database = os.getenv('AWS_RDS_DATABASE')
+# Creating a pooled engine once per process; pre-ping discards stale connections
+# left behind by RDS idle timeouts before they reach a caller
+engine = create_engine(
+    f'mysql+mysqlconnector://{settings.aws_rds_user}:{settings.aws_rds_password}'
+    f'@{settings.aws_rds_host}:{settings.aws_rds_port}/{settings.aws_rds_database}',
+    pool_size=10,
+    max_overflow=20,
+    pool_pre_ping=True,
+    pool_recycle=1800
+)
 
-def get_db_connection() -> mysql.connector.connection_cext.CMySQLConnection:
+def get_db_connection() -> PoolProxiedConnection:
     """
-    Establishes and returns a connection to the AWS RDS MySQL database using the provided credentials.
+    Returns a connection to the AWS RDS MySQL database drawn from the shared connection pool.
+    Closing the returned connection releases it back to the pool for reuse.
 
     Returns:
-        mysql.connector.connection_cext.CMySQLConnection: A MySQL database connection object.
+        PoolProxiedConnection: A pooled MySQL database connection proxy.
     """
-    return mysql.connector.connect(
-        host= aws_rds_host,
-        user=aws_rds_user,
-        password=aws_rds_password,
-        port =aws_rds_port,
-        database=aws_rds_database
-    )
\ No newline at end of file
+    return engine.raw_connection()
@@ -3,16 +3,48 @@
 # of questions and output formats. The class serves as a wrapper around the OpenAI API, providing a 
 # structured way to initialize and manage AI prompts and responses within the application.
 
+import asyncio
+import threading
+import time
 import openai
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 from project_logging import logging_module
 
+# One persistent event loop on a daemon thread for every async OpenAI call.
+# The shared AsyncOpenAI client binds its keep-alive connections to the loop
+# they were opened on, so driving it through throwaway asyncio.run() loops
+# fails with "Event loop is closed" on the second call in a process.
+_async_loop = asyncio.new_event_loop()
+threading.Thread(target=_async_loop.run_forever, name="openai-async-loop", daemon=True).start()
+
+def run_async(coro):
+    """
+    Runs the coroutine on the persistent event loop and blocks until it completes.
+
+    Args:
+        coro: The coroutine to execute.
+
+    Returns:
+        The coroutine's result.
+    """
+    return asyncio.run_coroutine_threadsafe(coro, _async_loop).result()
+
+# Prompt templates indexed by format_type, precomputed once so format_content
+# is a single table lookup instead of an if/elif chain
+_CONTENT_TEMPLATES = (
+    "Question: ```{question}```\nOutput Format: {output_format}\n",
+    "Question: ```{question}```\nTranscription: {transcription}\nOutput Format: {output_format}\n",
+    "Question: ```{question}```\nTranscription: {transcription}\nAnnotator Steps: {annotator_steps}\nOutput Format: {output_format}\n",
+    "Question: ```{question}```\nAnnotator Steps: {annotator_steps}\nOutput Format: {output_format}\n",
+)
+
 class OpenAIClient:
     def __init__(self):
         """
         Initializes the OpenAIClient with all system prompts.
         """
         self.client = OpenAI()  # Initialize OpenAI client
+        self.async_client = AsyncOpenAI()  # Async client for concurrent prompts
 
         # System content strings
         self.val_system_content = """Every prompt will begin with the text \"Question:\" followed by the question \
@@ -44,7 +76,61 @@ reasoning or references for your answer."
 
         self.assistant_instruction = """You are an assistant that answers any questions relevant to the \
 file that is uploaded in the thread. """
-    
+
+        # Cache of long-lived assistants keyed by (model, tool, system content)
+        # so file prompts reuse one assistant instead of creating and deleting
+        # one per call
+        self.assistant_cache = {}
+
+    def get_assistant(self, model: str, tool: str, system_content: str):
+        """
+        Returns a cached assistant for the given model, tool, and system content,
+        creating it on first use.
+
+        Args:
+            model (str): The model the assistant should use.
+            tool (str): The assistant tool type (e.g., 'file_search' or 'code_interpreter').
+            system_content (str): The system message appended to the assistant instructions.
+
+        Returns:
+            Assistant: The cached or newly created assistant.
+        """
+        cache_key = (model.lower(), tool, system_content)
+        if cache_key not in self.assistant_cache:
+            self.assistant_cache[cache_key] = self.client.beta.assistants.create(
+                instructions=self.assistant_instruction + system_content,
+                model=model.lower(),
+                tools=[{"type": tool}],
+            )
+            logging_module.log_success(f"Assistant created with ID: {self.assistant_cache[cache_key].id}")
+        return self.assistant_cache[cache_key]
+
+    def poll_run(self, thread_id: str, assistant_id: str):
+        """
+        Creates a run on the thread and polls it with exponential backoff until it
+        leaves the queued/in-progress states, instead of busy-polling at a fixed rate.
+
+        Args:
+            thread_id (str): The ID of the thread to run.
+            assistant_id (str): The ID of the assistant executing the run.
+
+        Returns:
+            Run: The finished run object.
+        """
+        run = self.client.beta.threads.runs.create(
+            thread_id=thread_id,
+            assistant_id=assistant_id,
+        )
+
+        # Back off from 0.5s up to 4s between retrieves to avoid hammering the API
+        attempt = 0
+        while run.status in ('queued', 'in_progress'):
+            time.sleep(min(0.5 * 2 ** attempt, 4))
+            attempt += 1
+            run = self.client.beta.threads.runs.retrieve(run.id, thread_id=thread_id)
+
+        return run
+
     def format_content(self, format_type: int, question: str, transcription: str = None, annotator_steps: str = None) -> str:
         """
         Formats the content based on whether it is annotated or not.
@@ -58,14 +144,9 @@ file that is uploaded in the thread. """
         Returns:
             str: The formatted content.
         """
-        if format_type == 0:
-            return f"Question: ```{question}```\nOutput Format: {self.output_format}\n"
-        elif format_type == 1:
-            return f"Question: ```{question}```\nTranscription: {transcription}\nOutput Format: {self.output_format}\n"
-        elif format_type == 2:
-            return f"Question: ```{question}```\nTranscription: {transcription}\nAnnotator Steps: {annotator_steps}\nOutput Format: {self.output_format}\n"
-        else:
-            return f"Question: ```{question}```\nAnnotator Steps: {annotator_steps}\nOutput Format: {self.output_format}\n"
+        template = _CONTENT_TEMPLATES[format_type if format_type in (0, 1, 2) else 3]
+        return template.format(question=question, transcription=transcription,
+                               annotator_steps=annotator_steps, output_format=self.output_format)
         
     def validation_prompt(self, system_content: str, user_content: str, model: str, imageurl: str = None) -> str:
         """
@@ -83,8 +164,8 @@ file that is uploaded in the thread. """
 
         try:
 
-            logging_module.log_success(f"System Content: {system_content}")
-            logging_module.log_success(f"User Content: {user_content}")
+            logging_module.log_debug("System Content: %s", system_content)
+            logging_module.log_debug("User Content: %s", user_content)
 
             if imageurl:     
                 response = self.client.chat.completions.create(
@@ -114,7 +195,7 @@ file that is uploaded in the thread. """
                     ]
                 )
 
-            logging_module.log_success(f"Response: {response.choices[0].message.content}")
+            logging_module.log_debug("Response: %s", response.choices[0].message.content)
 
             return response.choices[0].message.content
         
@@ -128,6 +209,151 @@ file that is uploaded in the thread. """
             logging_module.log_error(f"An unexpected error occurred: {str(e)}")
             return f"Error-BDIA: {e}"
     
+    async def validation_prompt_async(self, system_content: str, user_content: str, model: str, imageurl: str = None) -> str:
+        """
+        Sends a validation prompt to the model using the async client and returns the model's response.
+
+        Args:
+            system_content (str): The system message that sets the context for the model.
+            user_content (str): The user message to validate or respond to.
+            model (str): The model to be used for generating the response.
+            imageurl (str, optional): The URL of an image to be included in the prompt, if any. Defaults to None.
+
+        Returns:
+            str: The model's response.
+        """
+
+        try:
+
+            logging_module.log_debug("System Content: %s", system_content)
+            logging_module.log_debug("User Content: %s", user_content)
+
+            if imageurl:
+                response = await self.async_client.chat.completions.create(
+                    model=model.lower(),
+                    messages=[
+                        {"role": "system", "content": system_content},
+                        {
+                            "role": "user",
+                            "content": [
+                                {"type": "text", "text": user_content},
+                                {"type": "image_url",
+                                "image_url": {
+                                    "url": imageurl,
+                                    "detail": "low"
+                                    }
+                                },
+                            ],
+                        }
+                    ]
+                )
+            else:
+                response = await self.async_client.chat.completions.create(
+                    model=model.lower(),
+                    messages=[
+                        {"role": "system", "content": system_content},
+                        {"role": "user", "content": user_content}
+                    ]
+                )
+
+            logging_module.log_debug("Response: %s", response.choices[0].message.content)
+
+            return response.choices[0].message.content
+
+        except openai.BadRequestError as e:
+            logging_module.log_error(f"Error: {e}")
+            return f"Error-BDIA: {e}"
+        except openai.APIError as e:
+            logging_module.log_error(f"Error: {e}")
+            return f"Error-BDIA: {e}"
+        except Exception as e:
+            logging_module.log_error(f"An unexpected error occurred: {str(e)}")
+            return f"Error-BDIA: {e}"
+
+    def validation_prompt_stream(self, system_content: str, user_content: str, model: str, imageurl: str = None):
+        """
+        Sends a validation prompt to the model with streaming enabled and yields the response
+        text chunk by chunk, so callers can display tokens as they arrive instead of waiting
+        for the full completion.
+
+        Args:
+            system_content (str): The system message that sets the context for the model.
+            user_content (str): The user message to validate or respond to.
+            model (str): The model to be used for generating the response.
+            imageurl (str, optional): The URL of an image to be included in the prompt, if any. Defaults to None.
+
+        Yields:
+            str: The next chunk of the model's response, or a single Error-BDIA message on failure.
+        """
+
+        try:
+
+            logging_module.log_debug("System Content: %s", system_content)
+            logging_module.log_debug("User Content: %s", user_content)
+
+            if imageurl:
+                user_message = {
+                    "role": "user",
+                    "content": [
+                        {"type": "text", "text": user_content},
+                        {"type": "image_url",
+                        "image_url": {
+                            "url": imageurl,
+                            "detail": "low"
+                            }
+                        },
+                    ],
+                }
+            else:
+                user_message = {"role": "user", "content": user_content}
+
+            stream = self.client.chat.completions.create(
+                model=model.lower(),
+                messages=[
+                    {"role": "system", "content": system_content},
+                    user_message
+                ],
+                stream=True
+            )
+
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+        except openai.BadRequestError as e:
+            logging_module.log_error(f"Error: {e}")
+            yield f"Error-BDIA: {e}"
+        except openai.APIError as e:
+            logging_module.log_error(f"Error: {e}")
+            yield f"Error-BDIA: {e}"
+        except Exception as e:
+            logging_module.log_error(f"An unexpected error occurred: {str(e)}")
+            yield f"Error-BDIA: {e}"
+
+    def validation_prompt_batch(self, prompts: list, model: str, max_concurrency: int = 20) -> list:
+        """
+        Runs a batch of validation prompts concurrently and returns the responses in order.
+
+        Args:
+            prompts (list): A list of (system_content, user_content) tuples to send to the model.
+            model (str): The model to be used for generating the responses.
+            max_concurrency (int, optional): The maximum number of in-flight requests. Defaults to 20.
+
+        Returns:
+            list: The model's responses, in the same order as the prompts.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run_one(system_content: str, user_content: str) -> str:
+            async with semaphore:
+                return await self.validation_prompt_async(system_content, user_content, model)
+
+        async def run_all() -> list:
+            return await asyncio.gather(*[run_one(system_content, user_content)
+                                          for system_content, user_content in prompts])
+
+        return run_async(run_all())
+
     def file_validation_prompt(self, file_path: str, system_content: str, validation_content: str, model: str) -> str:
         """
         Sends a validation prompt with a file to the model and returns the response.
@@ -144,18 +370,13 @@ file that is uploaded in the thread. """
         
         try:
 
-            logging_module.log_success(f"System Content: {system_content}")
-            logging_module.log_success(f"User Content: {validation_content}")
-
-            file_assistant = self.client.beta.assistants.create(
-                instructions=self.assistant_instruction + system_content,
-                model=model.lower(),
-                tools=[{"type": "file_search"}],
-            )
+            logging_module.log_debug("System Content: %s", system_content)
+            logging_module.log_debug("User Content: %s", validation_content)
 
-            logging_module.log_success(f"Assistant created with ID: {file_assistant.id}")
+            file_assistant = self.get_assistant(model, "file_search", system_content)
 
-            query_file = self.client.files.create(file=open(file_path, "rb"), purpose="assistants")
+            with open(file_path, "rb") as file_handle:
+                query_file = self.client.files.create(file=file_handle, purpose="assistants")
 
             logging_module.log_success(f"File stored with ID: {query_file.id}")
 
@@ -172,10 +393,7 @@ file that is uploaded in the thread. """
 
             logging_module.log_success(f"Message created in thread {empty_thread.id} with file {query_file.id}")
 
-            run = self.client.beta.threads.runs.create_and_poll(
-                thread_id=empty_thread.id,
-                assistant_id=file_assistant.id,
-            )
+            run = self.poll_run(empty_thread.id, file_assistant.id)
 
             logging_module.log_success(f"Run executed with ID: {run.id}")
 
@@ -184,9 +402,9 @@ file that is uploaded in the thread. """
                     thread_id=run.thread_id
                 )
 
-                logging_module.log_success(f"Response: {messages.data[0].content[0].text.value}")
+                logging_module.log_debug("Response: %s", messages.data[0].content[0].text.value)
 
-                self.cleanup_resources(file_assistant.id, query_file.id, empty_thread.id)
+                self.cleanup_resources(query_file.id, empty_thread.id)
 
                 return messages.data[0].content[0].text.value
             else:
@@ -218,18 +436,13 @@ file that is uploaded in the thread. """
 
         try:
 
-            logging_module.log_success(f" System Content: {system_content}")
-            logging_module.log_success(f" User Content: {validation_content}")
+            logging_module.log_debug("System Content: %s", system_content)
+            logging_module.log_debug("User Content: %s", validation_content)
 
-            file_assistant = self.client.beta.assistants.create(
-                instructions=self.assistant_instruction + system_content,
-                model=model.lower(),
-                tools=[{"type": "code_interpreter"}],
-            )
+            file_assistant = self.get_assistant(model, "code_interpreter", system_content)
 
-            logging_module.log_success(f"Assistant created with ID: {file_assistant.id}")
-
-            query_file = self.client.files.create(file=open(file_path, "rb"), purpose="assistants")
+            with open(file_path, "rb") as file_handle:
+                query_file = self.client.files.create(file=file_handle, purpose="assistants")
 
             logging_module.log_success(f"File stored with ID: {query_file.id}")
 
@@ -246,10 +459,7 @@ file that is uploaded in the thread. """
 
             logging_module.log_success(f"Message created in thread {empty_thread.id} with file {query_file.id}")
 
-            run = self.client.beta.threads.runs.create_and_poll(
-                thread_id=empty_thread.id,
-                assistant_id=file_assistant.id,
-            )
+            run = self.poll_run(empty_thread.id, file_assistant.id)
 
             logging_module.log_success(f"Run executed with ID: {run.id}")
 
@@ -258,9 +468,9 @@ file that is uploaded in the thread. """
                     thread_id=empty_thread.id
                 )
 
-                logging_module.log_success(f"Response: {messages.data[0].content[0].text.value}")
+                logging_module.log_debug("Response: %s", messages.data[0].content[0].text.value)
 
-                self.cleanup_resources(file_assistant.id, query_file.id, empty_thread.id)
+                self.cleanup_resources(query_file.id, empty_thread.id)
 
                 return messages.data[0].content[0].text.value
             else:
@@ -287,13 +497,14 @@ file that is uploaded in the thread. """
             str: The transcribed text if successful, or an error message if a problem occurs.
         """
         try:
-            messages = self.client.audio.transcriptions.create(
-                model="whisper-1",
-                file=open(file_path, "rb"),
-                response_format="text"
-            )
+            with open(file_path, "rb") as file_handle:
+                messages = self.client.audio.transcriptions.create(
+                    model="whisper-1",
+                    file=file_handle,
+                    response_format="text"
+                )
 
-            logging_module.log_success(f"Transcript Generated: {messages}")
+            logging_module.log_debug("Transcript Generated: %s", messages)
 
             return messages
         except openai.BadRequestError as e:
@@ -306,12 +517,12 @@ file that is uploaded in the thread. """
             logging_module.log_error(f"An unexpected error occurred: {str(e)}")
             return f"Error-BDIA: {e}"
     
-    def cleanup_resources(self, assistant_id: str, file_id: str, thread_id: str) -> None:
+    def cleanup_resources(self, file_id: str, thread_id: str) -> None:
         """
-        Cleans up the resources by deleting the assistant, file, and thread after the validation is complete.
+        Cleans up the resources by deleting the file and thread after the validation is complete.
+        Assistants are long-lived and reused across calls, so they are intentionally kept.
 
         Args:
-            assistant_id (str): The ID of the assistant to be deleted.
             file_id (str): The ID of the file to be deleted.
             thread_id (str): The ID of the thread to be deleted.
 
@@ -319,16 +530,12 @@ file that is uploaded in the thread. """
             None
         """
         try:
-            # Delete the assistant
-            self.client.beta.assistants.delete(assistant_id)
-            logging_module.log_success(f"Assistant with {assistant_id} deleted successfully")
-
             # Delete the file
             self.client.files.delete(file_id)
-            logging_module.log_success(f"Assistant with {file_id} deleted successfully")
+            logging_module.log_success(f"File with {file_id} deleted successfully")
 
             # Delete the thread
             self.client.beta.threads.delete(thread_id)
-            logging_module.log_success(f"Assistant with {thread_id} deleted successfully")
+            logging_module.log_success(f"Thread with {thread_id} deleted successfully")
         except Exception as e:
             logging_module.log_error(f"Error occurred while cleaning up resources!")
\ No newline at end of file
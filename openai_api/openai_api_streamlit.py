@@ -1,5 +1,12 @@
+import asyncio
+import hashlib
+
+import numpy as np
+import orjson
+
 from data.data_read import insert_model_response
 from data.data_s3 import RETRIEVAL_EXT, CI_EXT, IMG_EXT, MP3_EXT, ERR_EXT
+from project_logging import logging_module
 
 def ask_gpt(openai_client, system_content: str, question_selected: str, format_type: int, model: str, loaded_file: dict = None, annotated_steps: str = None):
     """
@@ -49,7 +56,178 @@ def ask_gpt(openai_client, system_content: str, question_selected: str, format_t
     
     return ai_response
 
-def answer_validation_check(final_answer: str,validation_answer: str) -> bool:
+async def ask_gpt_async(openai_client, system_content: str, question_selected: str, format_type: int, model: str, loaded_file: dict = None, annotated_steps: str = None):
+    """
+    Asynchronous counterpart of ask_gpt. Chat-completion prompts go through the async
+    OpenAI client so several candidates can be awaited concurrently with asyncio.gather;
+    the assistant/file and transcription paths run in a worker thread to keep the event
+    loop free.
+
+    Args:
+        openai_client (OpenAIClient): The client instance used to interact with the OpenAI API.
+        system_content (str): The system message that sets the context for the model.
+        question_selected (str): The question that requires a response from the model.
+        format_type (int): The format type used to determine how the content is structured.
+                           - 0: Basic formatting
+                           - 1 and 2: Uses transcription data
+                           - 3: Uses annotated steps
+        model (str): The model to be used for generating the response (e.g., "gpt-4").
+        loaded_file (dict, optional): The file details dictionary containing 'path', 'extension', and optionally 'url'
+                                      if a file is provided. Used for handling file-based prompts. Defaults to None.
+        annotated_steps (str, optional): The annotated steps to be included when 'format_type' is 3. Defaults to None.
+
+    Returns:
+        str: The response generated by the model or an error message if the file extension is not supported.
+    """
+    if format_type == 0:
+        validation_content = openai_client.format_content(format_type, question_selected)
+    elif format_type == 3:
+        validation_content = openai_client.format_content(format_type, question_selected, None, annotated_steps)
+    if loaded_file:
+        if loaded_file["extension"] in RETRIEVAL_EXT:
+            ai_response = await asyncio.to_thread(openai_client.file_validation_prompt,
+                                                  loaded_file["path"], system_content, validation_content, model)
+        elif loaded_file["extension"] in CI_EXT:
+            ai_response = await asyncio.to_thread(openai_client.ci_file_validation_prompt,
+                                                  loaded_file["path"], system_content, validation_content, model)
+        elif loaded_file["extension"] in IMG_EXT:
+            ai_response = await openai_client.validation_prompt_async(system_content, validation_content, model, loaded_file["url"])
+        elif loaded_file["extension"] in ERR_EXT:
+            ai_response = "The LLM model currently does not support these file extensions."
+        else:
+            transcription = await asyncio.to_thread(openai_client.stt_validation_prompt, loaded_file["path"])
+            if format_type == 1:
+                validation_content = openai_client.format_content(format_type, question_selected, transcription)
+            elif format_type == 2:
+                validation_content = openai_client.format_content(format_type, question_selected, transcription, annotated_steps)
+            ai_response = await openai_client.validation_prompt_async(system_content, validation_content, model)
+
+    else:
+        ai_response = await openai_client.validation_prompt_async(system_content, validation_content, model)
+
+    return ai_response
+
+def ask_gpt_stream(openai_client, system_content: str, question_selected: str, format_type: int, model: str, loaded_file: dict = None, annotated_steps: str = None):
+    """
+    Streaming counterpart of ask_gpt. Chat-completion prompts yield response chunks as
+    they arrive so the UI can render them via st.write_stream; the assistant/file paths
+    do not support streaming and yield their full response once.
+
+    Args:
+        openai_client (OpenAIClient): The client instance used to interact with the OpenAI API.
+        system_content (str): The system message that sets the context for the model.
+        question_selected (str): The question that requires a response from the model.
+        format_type (int): The format type used to determine how the content is structured.
+                           - 0: Basic formatting
+                           - 1 and 2: Uses transcription data
+                           - 3: Uses annotated steps
+        model (str): The model to be used for generating the response (e.g., "gpt-4").
+        loaded_file (dict, optional): The file details dictionary containing 'path', 'extension', and optionally 'url'
+                                      if a file is provided. Used for handling file-based prompts. Defaults to None.
+        annotated_steps (str, optional): The annotated steps to be included when 'format_type' is 3. Defaults to None.
+
+    Yields:
+        str: Chunks of the model's response, or a single error message where streaming does not apply.
+    """
+    if format_type == 0:
+        validation_content = openai_client.format_content(format_type, question_selected)
+    elif format_type == 3:
+        validation_content = openai_client.format_content(format_type, question_selected, None, annotated_steps)
+    if loaded_file:
+        if loaded_file["extension"] in RETRIEVAL_EXT:
+            yield openai_client.file_validation_prompt(loaded_file["path"], system_content, validation_content, model)
+        elif loaded_file["extension"] in CI_EXT:
+            yield openai_client.ci_file_validation_prompt(loaded_file["path"], system_content, validation_content, model)
+        elif loaded_file["extension"] in IMG_EXT:
+            yield from openai_client.validation_prompt_stream(system_content, validation_content, model, loaded_file["url"])
+        elif loaded_file["extension"] in ERR_EXT:
+            yield "The LLM model currently does not support these file extensions."
+        else:
+            transcription = openai_client.stt_validation_prompt(loaded_file["path"])
+            if format_type == 1:
+                validation_content = openai_client.format_content(format_type, question_selected, transcription)
+            elif format_type == 2:
+                validation_content = openai_client.format_content(format_type, question_selected, transcription, annotated_steps)
+            yield from openai_client.validation_prompt_stream(system_content, validation_content, model)
+
+    else:
+        yield from openai_client.validation_prompt_stream(system_content, validation_content, model)
+
+def ask_gpt_batch(openai_client, system_content: str, questions: list, model: str) -> list:
+    """
+    Packs several questions into a single prompt and parses the answers back out, so
+    backfill runs pay for the system prompt once per batch instead of once per question.
+    Only plain text questions are supported; file-based prompts still go through ask_gpt.
+
+    Args:
+        openai_client (OpenAIClient): The client instance used to interact with the OpenAI API.
+        system_content (str): The system message that sets the context for the model.
+        questions (list): The questions to be answered in one call.
+        model (str): The model to be used for generating the responses (e.g., "gpt-4o").
+
+    Returns:
+        list: One answer per question, in the same order as the questions. Questions the
+              model did not answer come back as empty strings.
+    """
+    if not questions:
+        return []
+
+    batch_system_content = system_content + """ The prompt contains several numbered Questions. \
+Answer every Question and respond only with a JSON array of objects of the form \
+{"idx": <question number>, "answer": "<answer>"} with no surrounding text."""
+
+    user_content = "\n".join(f"Question {idx}: ```{question}```"
+                             for idx, question in enumerate(questions))
+    user_content += f"\nOutput Format: {openai_client.output_format}\n"
+
+    response = openai_client.validation_prompt(batch_system_content, user_content, model)
+
+    if response.startswith("Error-BDIA"):
+        return [response] * len(questions)
+
+    try:
+        # Tolerate a fenced code block around the JSON array
+        parsed = orjson.loads(response.strip().strip('`').removeprefix('json'))
+        # Models often emit the index as a string, so coerce before matching
+        answers = {int(item["idx"]): item["answer"] for item in parsed}
+        return [answers.get(idx, "") for idx in range(len(questions))]
+    except Exception as e:
+        logging_module.log_error(f"Could not parse batched response: {e}")
+        return [""] * len(questions)
+
+# Embeddings cached by text digest, so repeated validations of the same
+# answer pair cost a local dot product instead of an API round-trip
+_embedding_cache = {}
+
+# Cosine similarity above which two answers are considered the same
+_SIMILARITY_THRESHOLD = 0.85
+
+def _embed_texts(openai_client, texts: list) -> list:
+    """
+    Returns one embedding vector per text, fetching only the cache misses in a
+    single batched embeddings call and memoizing them for the process lifetime.
+
+    Args:
+        openai_client (OpenAIClient): The client instance used to interact with the OpenAI API.
+        texts (list): The texts to embed.
+
+    Returns:
+        list: One np.ndarray embedding per input text, in input order.
+    """
+    digests = [hashlib.sha256(text.encode()).hexdigest() for text in texts]
+    misses = [(digest, text) for digest, text in zip(digests, texts) if digest not in _embedding_cache]
+
+    if misses:
+        response = openai_client.client.embeddings.create(
+            model='text-embedding-3-small',
+            input=[text for _, text in misses],
+        )
+        for (digest, _), item in zip(misses, response.data):
+            _embedding_cache[digest] = np.asarray(item.embedding, dtype=np.float16)
+
+    return [_embedding_cache[digest] for digest in digests]
+
+def _string_validation_check(final_answer: str, validation_answer: str) -> bool:
     """
     Checks whether the final answer is present in the validation answer. The check is case-insensitive 
     and handles both numeric and non-numeric answers.
@@ -62,9 +240,6 @@ def answer_validation_check(final_answer: str,validation_answer: str) -> bool:
         bool: Returns True if the final answer is not present in the validation answer, 
               otherwise returns False.
     """
-    final_answer = final_answer.strip().lower()
-    validation_answer = validation_answer.strip().lower().replace('`', '')
-
         # Check if final_answer consists only of numbers
     if final_answer.isdigit():
         # Convert validation_answer to a list of elements split by whitespace
@@ -74,4 +249,31 @@ def answer_validation_check(final_answer: str,validation_answer: str) -> bool:
         return final_answer not in validation_list
     else:
         # If final_answer is not only numbers, perform the original check
-        return final_answer not in validation_answer
\ No newline at end of file
+        return final_answer not in validation_answer
+
+def answer_validation_check(final_answer: str, validation_answer: str, openai_client=None) -> bool:
+    """
+    Checks whether the model's answer matches the expected final answer. The default is the
+    case-insensitive containment check. Passing an OpenAI client opts in to comparing
+    non-numeric answers by cosine similarity of their (cached) embeddings instead; numeric
+    answers and any embedding failure fall back to the containment check. The opt-in path
+    costs an embeddings call per new answer text, so it is off on the grading hot path.
+
+    Returns:
+        bool: Returns True if the answers do not match (wrong answer), otherwise False.
+    """
+    final_answer = final_answer.strip().lower()
+    validation_answer = validation_answer.strip().lower().replace('`', '')
+
+    # Numbers need an exact match, so embeddings do not apply there
+    if openai_client is not None and not final_answer.isdigit():
+        try:
+            expected, predicted = _embed_texts(openai_client, [final_answer, validation_answer])
+            expected = expected.astype(np.float32)
+            predicted = predicted.astype(np.float32)
+            similarity = np.dot(expected, predicted) / (np.linalg.norm(expected) * np.linalg.norm(predicted))
+            return similarity < _SIMILARITY_THRESHOLD
+        except Exception as e:
+            logging_module.log_error(f"Embedding comparison failed, falling back to string check: {e}")
+
+    return _string_validation_check(final_answer, validation_answer)
\ No newline at end of file
@@ -4,22 +4,32 @@
 # client for generating model responses and logs actions to monitor the usage of this prediction page.
 
 import streamlit as st
-import re
-import json
+from collections import namedtuple
 from datetime import datetime
 from data.data_s3 import download_file, process_data_and_generate_url, MP3_EXT
 from data.data_read import fetch_data_from_db
 from data.data_read import insert_model_response
-from openai_api.openai_api_call import OpenAIClient
-from openai_api.openai_api_streamlit import ask_gpt, answer_validation_check
+from openai_api.openai_api_call import OpenAIClient, run_async
+from openai_api.openai_api_streamlit import ask_gpt_async, ask_gpt_batch, ask_gpt_stream, answer_validation_check
 from project_logging import logging_module
 import time
 
-# Initialize session state for the data
-if 'data_frame' not in st.session_state:
-    st.session_state.data_frame = fetch_data_from_db()
-if 'openai_client' not in st.session_state:
-    st.session_state.openai_client = OpenAIClient()
+# Load the (cached) GAIA data and initialize session state
+data_frame = fetch_data_from_db()
+
+@st.cache_resource
+def get_openai_client() -> OpenAIClient:
+    """
+    Builds the OpenAIClient once per process and shares it across sessions, so
+    every user reuses the same HTTP connection pool instead of constructing a
+    new client per session.
+
+    Returns:
+        OpenAIClient: The shared client instance.
+    """
+    return OpenAIClient()
+
+openai_client = get_openai_client()
 if "ask_gpt_clicked" not in st.session_state:
     st.session_state.ask_gpt_clicked = False
 if "ask_again_button_clicked" not in st.session_state:
@@ -76,21 +86,42 @@ def manage_steps_widget() -> None:
     st.session_state["ask_gpt_clicked"] = True
     st.session_state["ask_again_button_clicked"] = False
 
+# Questions per batched backfill call; larger batches risk the model
+# truncating the JSON array it answers with
+BACKFILL_BATCH_SIZE = 10
+
+# The extension choices are a fixed set, so they never need recomputing
+FILE_EXTENSIONS = ('PDF', 'DOCX', 'TXT', 'PPTX', 'CSV', 'XLSX', 'PY', 'ZIP', 'JPG', 'PNG', 'PDB', 'JSONLD', 'MP3')
+
+@st.cache_data(show_spinner=False)
+def get_level_options(df) -> tuple:
+    """
+    Returns the sorted difficulty levels as a tuple, computed once per DataFrame
+    instead of re-scanning and re-sorting the Level column on every rerun.
+
+    Args:
+        df (pd.DataFrame): The DataFrame containing the 'Level' column.
+
+    Returns:
+        tuple: The sorted unique difficulty levels.
+    """
+    return tuple(sorted(df['Level'].unique()))
+
 with st.sidebar:
     level_filter = st.selectbox("**Difficulty Level**",
-                                sorted(st.session_state.data_frame['Level'].unique()),
+                                get_level_options(data_frame),
                                 index=None,
                                 on_change=button_reset,
                                 args=("ask_gpt_clicked",)
     )
-    
-    file_extensions = ['PDF', 'DOCX', 'TXT', 'PPTX', 'CSV', 'XLSX', 'PY', 'ZIP', 'JPG', 'PNG', 'PDB', 'JSONLD', 'MP3']
-    
+
     extension_filter = st.selectbox("**Extension**",
-                                    file_extensions,
+                                    FILE_EXTENSIONS,
                                     index=None,
     )
 
+    backfill_clicked = st.button("Backfill Responses")
+
 @st.fragment
 def download_fragment(file_name: str) -> None:
     """
@@ -120,7 +151,7 @@ def gpt_steps(question: str, answer: str, model: str, file: dict) -> None:
     """
     steps_on = st.toggle("**Provide Steps**")
     if steps_on:
-        handle_wrong_answer_flow(st.session_state.data_frame, question, st.session_state.openai_client, answer, model, file)
+        handle_wrong_answer_flow(data_frame, question, openai_client, answer, model, file)
 
 def handle_file_processing(question_selected: str, dataframe) -> dict:
     """
@@ -158,10 +189,7 @@ def handle_wrong_answer_flow(data_frame, question_selected: str, openai_client,
     Returns:
         None: This function does not return a value; it handles the logic of displaying results and updating session state.
     """
-    steps = data_frame[data_frame['Question'] == question_selected]
-    steps = steps['Annotator Metadata'].iloc[0]
-    steps_dict = json.loads(steps)
-    steps_text = steps_dict.get('Steps', 'No steps found')
+    steps_text = build_question_lookup(data_frame)[question_selected].steps_text
 
     st.session_state.steps_text = st.text_area(
         '**Steps:**',
@@ -173,11 +201,11 @@ def handle_wrong_answer_flow(data_frame, question_selected: str, openai_client,
     if st.session_state.ask_again_button_clicked:
         
         if loaded_file and loaded_file["extension"] in MP3_EXT:
-            ann_ai_response = ask_gpt(openai_client, openai_client.ann_audio_system_content, 
-                                question_selected, 2, model, loaded_file, st.session_state.steps_text)
+            ann_ai_response = run_async(ask_gpt_async(openai_client, openai_client.ann_audio_system_content,
+                                question_selected, 2, model, loaded_file, st.session_state.steps_text))
         else:
-            ann_ai_response = ask_gpt(openai_client, openai_client.ann_system_content, 
-                                question_selected, 3, model, loaded_file, st.session_state.steps_text)
+            ann_ai_response = run_async(ask_gpt_async(openai_client, openai_client.ann_system_content,
+                                question_selected, 3, model, loaded_file, st.session_state.steps_text))
         
         if ann_ai_response:
             "**LLM Response**: " + ann_ai_response
@@ -191,9 +219,52 @@ def handle_wrong_answer_flow(data_frame, question_selected: str, openai_client,
             st.success('GPT predicted the correct answer after the steps were provided.')
             insert_model_response(st.session_state.task_id_sel, datetime.now().date(), model, ann_ai_response, 'correct after steps')
 
+# One record per question so the hot paths read scalars without DataFrame masks
+QuestionRecord = namedtuple('QuestionRecord', ['task_id', 'final_answer', 'steps_text'])
+
+@st.cache_data(show_spinner=False)
+def build_question_lookup(df) -> dict:
+    """
+    Builds a dictionary mapping each Question to its task_id, final answer, and
+    pre-parsed annotator steps for O(1) access from the widget callbacks.
+
+    Args:
+        df (pd.DataFrame): The DataFrame containing the GAIA questions and metadata.
+
+    Returns:
+        dict: A dictionary keyed by Question with a QuestionRecord as the value.
+    """
+    return {
+        question: QuestionRecord(task_id, final_answer, steps_text)
+        for question, task_id, final_answer, steps_text
+        in zip(df['Question'], df['task_id'], df['Final answer'], df['steps_text'])
+    }
+
+@st.cache_data(show_spinner=False)
+def build_question_index(df) -> dict:
+    """
+    Groups the questions by (Level, file_extension) once, including level-only and
+    extension-only marginals, so filtering is a dict lookup instead of a column scan.
+
+    Args:
+        df (pd.DataFrame): The DataFrame containing 'Level', 'file_extension', and 'Question' columns.
+
+    Returns:
+        dict: A dictionary mapping (level, extension) keys to the matching Question Series,
+              with None standing in for an unused filter.
+    """
+    question_index = {}
+    for (level, extension), group in df.groupby(['Level', 'file_extension'], observed=True):
+        question_index[(level, extension)] = group['Question']
+    for level, group in df.groupby('Level', observed=True):
+        question_index[(level, None)] = group['Question']
+    for extension, group in df.groupby('file_extension', observed=True):
+        question_index[(None, extension)] = group['Question']
+    return question_index
+
 def filter_questions(level_filter: str = None, extension_filter: str = None):
     """
-    Filters questions from the session state DataFrame based on the specified level and/or file extension.
+    Filters questions from the DataFrame based on the specified level and/or file extension.
 
     Args:
         level_filter (str, optional): The level to filter questions by. Defaults to None.
@@ -202,23 +273,11 @@ def filter_questions(level_filter: str = None, extension_filter: str = None):
     Returns:
         pd.Series: A pandas Series containing the filtered questions.
     """
-    if level_filter and extension_filter:
-        filtered_questions = st.session_state.data_frame[
-            (st.session_state.data_frame['Level'] == level_filter) &
-            (st.session_state.data_frame['file_extension'] == extension_filter.lower())
-        ]['Question']
-    elif level_filter:
-        filtered_questions = st.session_state.data_frame[
-            st.session_state.data_frame['Level'] == level_filter
-        ]['Question']
-    elif extension_filter:
-        filtered_questions = st.session_state.data_frame[
-            st.session_state.data_frame['file_extension'] == extension_filter.lower()
-        ]['Question']
-    else:
-        filtered_questions = st.session_state.data_frame['Question']
-    
-    return filtered_questions
+    if not level_filter and not extension_filter:
+        return data_frame['Question']
+
+    lookup_key = (level_filter or None, extension_filter.lower() if extension_filter else None)
+    return build_question_index(data_frame).get(lookup_key, data_frame['Question'].iloc[0:0])
 
 question_selected = st.selectbox(
         "**Select a Question:**", 
@@ -230,16 +289,41 @@ question_selected = st.selectbox(
 
 model_options = ["GPT-4o", "GPT-4", "GPT-3.5-turbo"]
 
+if backfill_clicked:
+    # Backfill the filtered questions that have no associated file through
+    # bounded batched OpenAI calls and record the graded responses
+    question_lookup = build_question_lookup(data_frame)
+    no_file_questions = set(data_frame[data_frame['s3_url'].isnull()]['Question'])
+    backfill_questions = [question for question in filter_questions(level_filter, extension_filter)
+                          if question in no_file_questions]
+    inserted_count = 0
+    for batch_start in range(0, len(backfill_questions), BACKFILL_BATCH_SIZE):
+        batch_questions = backfill_questions[batch_start:batch_start + BACKFILL_BATCH_SIZE]
+        batch_answers = ask_gpt_batch(openai_client,
+                                      openai_client.val_system_content,
+                                      batch_questions, model_options[0])
+        for question, answer in zip(batch_questions, batch_answers):
+            # Empty strings and Error-BDIA markers are failures, not answers
+            if answer and not answer.startswith("Error-BDIA"):
+                question_record = question_lookup[question]
+                category = 'wrong answer' if answer_validation_check(question_record.final_answer, answer) else 'correct as-is'
+                insert_model_response(question_record.task_id, datetime.now().date(), model_options[0], answer, category)
+                inserted_count += 1
+    if inserted_count == len(backfill_questions):
+        st.success(f"Backfilled {inserted_count} responses with {model_options[0]}.")
+    else:
+        st.warning(f"Backfilled {inserted_count} of {len(backfill_questions)} responses with {model_options[0]}; see logs for failed batches.")
+
 if question_selected:
         st.text_area("**Selected Question**:", question_selected)
-        validate_answer = st.session_state.data_frame[st.session_state.data_frame['Question'] == question_selected]
-        task_id_sel = validate_answer['task_id'].iloc[0]
-        validate_answer = validate_answer['Final answer'].iloc[0]
+        question_record = build_question_lookup(data_frame)[question_selected]
+        task_id_sel = question_record.task_id
+        validate_answer = question_record.final_answer
         st.text_input("**Selected Question Answer is:**", validate_answer)
 
         st.session_state.task_id_sel = task_id_sel
 
-        loaded_file = handle_file_processing(question_selected, st.session_state.data_frame)
+        loaded_file = handle_file_processing(question_selected, data_frame)
 
         col1, col2 = st.columns(2)
 
@@ -258,25 +342,30 @@ if question_selected:
                     st.error("Please choose a model")
                 else:  
                     if loaded_file and loaded_file["extension"] in MP3_EXT:
-                        system_content = st.session_state.openai_client.audio_system_content
+                        system_content = openai_client.audio_system_content
                         format_type = 1
                     else:
-                        system_content = st.session_state.openai_client.val_system_content
+                        system_content = openai_client.val_system_content
                         format_type = 0
-                    ai_response = ask_gpt(st.session_state.openai_client, system_content, question_selected, format_type, model_chosen, loaded_file)
+                    # Stream the response so tokens appear as they arrive
+                    # instead of a blank screen until completion
+                    "**LLM Response:** "
+                    response_placeholder = st.empty()
+                    ai_response = response_placeholder.write_stream(
+                        ask_gpt_stream(openai_client, system_content, question_selected, format_type, model_chosen, loaded_file))
 
                     if ai_response:
-                        if re.match(r"Error-BDIA", ai_response):
+                        # The marker can appear mid-string when the stream
+                        # fails after some chunks already arrived
+                        if "Error-BDIA" in ai_response:
+                            response_placeholder.empty()
                             st.error("GPT 4 does not work for file search")
                             button_reset(st.session_state.ask_gpt_clicked)
 
                         elif ai_response== "The LLM model currently does not support these file extensions.":
-                            "**LLM Response:** " + ai_response
                             button_reset(st.session_state.ask_gpt_clicked)
 
                         else: 
-                            
-                            "**LLM Response:** " + ai_response
 
                             if  answer_validation_check(validate_answer,ai_response):
                                 st.error("Sorry, GPT predicted the wrong answer. Do you need the steps?")
@@ -7,23 +7,51 @@
 # for the selected filters.
 
 import streamlit as st
+import numpy as np
 import pandas as pd
-from data.data_read import fetch_data_from_db, fetch_data_from_db_dashboards
+from data.data_read import fetch_data_from_db, fetch_data_from_db_dashboards, fetch_dashboard_aggregates
 import altair as alt
 
-st.session_state.data_frame_dashboard = fetch_data_from_db_dashboards()
+# Both fetches are cached, so reruns reuse the in-memory DataFrames
+data_frame = fetch_data_from_db()
+data_frame_dashboard = fetch_data_from_db_dashboards()
 
-with st.sidebar:
-    selected_level = st.selectbox(
-            "**Select a Level:**", 
-            ["Overall","Level 1", "Level 2","Level 3"],
-            index=None,
-            key="level_selector",
-        )
+@st.cache_data(show_spinner=False)
+def merge_dashboard_frames(questions_df: pd.DataFrame, responses_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Joins the GAIA questions with the model responses on task_id and keeps the columns
+    the dashboard uses. Cached so reruns skip the merge while the inputs are unchanged.
+
+    Args:
+        questions_df (pd.DataFrame): The GAIA metadata DataFrame.
+        responses_df (pd.DataFrame): The model response DataFrame.
+
+    Returns:
+        pd.DataFrame: The merged DataFrame for the dashboard views.
+    """
+    # The questions frame is already indexed by task_id, so joining on the
+    # index reuses that hash table instead of rebuilding one per merge
+    merged = questions_df.join(responses_df.set_index('task_id'), how='inner')
+    return merged[['task_id','Level','Final answer','model_used','model_response','response_category']]
+
+@st.cache_data(show_spinner=False)
+def bar_chart_spec(overall_records: tuple) -> dict:
+    """
+    Builds the Vega-Lite spec for the response-category bar chart, cached on the
+    (tiny) aggregated records so reruns skip Altair object construction and
+    spec serialization.
+
+    Args:
+        overall_records (tuple): The (category, count) rows of the aggregated table.
 
-# Initialize session state for the data
-if 'data_frame' not in st.session_state:
-    st.session_state.data_frame = fetch_data_from_db()
+    Returns:
+        dict: The Vega-Lite chart spec.
+    """
+    overall = pd.DataFrame(overall_records, columns=["Response Category", "Number of Questions"])
+    return alt.Chart(overall).mark_bar(color="#ffd21f", size=40).encode(
+        x=alt.X('Response Category:O', axis=alt.Axis(labelAngle=0, labelLimit=200, titleFontWeight='bold')),
+        y=alt.Y("Number of Questions:Q", axis=alt.Axis(titleFontWeight='bold'))
+        ).to_dict()
 
 def dashboard_dataframe(dataframe: pd.DataFrame) -> None:
     """
@@ -44,17 +72,19 @@ def dashboard_dataframe(dataframe: pd.DataFrame) -> None:
         overall,
     hide_index=True)
 
-    bar_chart = alt.Chart(overall).mark_bar(color="#ffd21f", size=40).encode(
-        x=alt.X('Response Category:O', axis=alt.Axis(labelAngle=0, labelLimit=200, titleFontWeight='bold')),
-        y=alt.Y("Number of Questions:Q", axis=alt.Axis(titleFontWeight='bold'))
-        )
-    
-    st.altair_chart(bar_chart, use_container_width=True)
+    spec = bar_chart_spec(tuple(overall.itertuples(index=False, name=None)))
+
+    st.vega_lite_chart(spec, use_container_width=True)
 
 def model_perf_table(dataframe: pd.DataFrame) -> None:
     st.header("OpenAI Model Performance", divider="gray")
 
-    grouped_df = dataframe.groupby(['model_used', 'Level', 'response_category']).size().unstack(fill_value=0).reset_index()
+    # The input rows are already aggregated counts from SQL; crosstab spreads
+    # the response categories into columns in one tabulation pass without the
+    # intermediate three-level index a groupby/unstack chain would build
+    grouped_df = pd.crosstab([dataframe['model_used'], dataframe['Level']],
+                             dataframe['response_category'],
+                             values=dataframe['n'], aggfunc='sum').fillna(0).reset_index()
 
     if not grouped_df.empty:
         # Use .get() to handle missing columns by providing a default value of 0
@@ -64,13 +94,27 @@ def model_perf_table(dataframe: pd.DataFrame) -> None:
         # Calculate the score for each level
         grouped_df['level_score'] = (grouped_df['total_correct'] / grouped_df['total_questions']) * 100
 
-        # Calculate the average score across all levels for each model
-        average_scores_df = grouped_df.groupby('model_used').agg(
-            average_score=('level_score', 'mean'),
-            level_1_score=('level_score', lambda x: x[grouped_df['Level'] == '1'].mean() if '1' in grouped_df['Level'].values else 0),
-            level_2_score=('level_score', lambda x: x[grouped_df['Level'] == '2'].mean() if '2' in grouped_df['Level'].values else 0),
-            level_3_score=('level_score', lambda x: x[grouped_df['Level'] == '3'].mean() if '3' in grouped_df['Level'].values else 0)
-        ).reset_index()
+        # Scatter the level scores into a dense (model, level) matrix via
+        # categorical codes, so the per-level spread and per-model average are
+        # plain NumPy indexing and reductions instead of pivot/groupby passes
+        model_cat = grouped_df['model_used'].astype('category')
+        level_cat = grouped_df['Level'].astype('category')
+        score_matrix = np.zeros((len(model_cat.cat.categories), len(level_cat.cat.categories)))
+        filled = np.zeros(score_matrix.shape, dtype=bool)
+        score_matrix[model_cat.cat.codes, level_cat.cat.codes] = grouped_df['level_score'].to_numpy()
+        filled[model_cat.cat.codes, level_cat.cat.codes] = True
+
+        # Average each model over the levels it actually has rows for
+        average_score = score_matrix.sum(axis=1) / filled.sum(axis=1)
+
+        average_scores_df = pd.DataFrame(score_matrix,
+                                         columns=[f'level_{level}_score' for level in level_cat.cat.categories])
+        for column in ('level_1_score', 'level_2_score', 'level_3_score'):
+            if column not in average_scores_df.columns:
+                average_scores_df[column] = 0.0
+        average_scores_df = average_scores_df[['level_1_score', 'level_2_score', 'level_3_score']]
+        average_scores_df.insert(0, 'average_score', average_score)
+        average_scores_df.insert(0, 'model_used', model_cat.cat.categories)
 
         if not average_scores_df.empty:
             st.dataframe(
@@ -88,37 +132,65 @@ def model_perf_table(dataframe: pd.DataFrame) -> None:
     else:
         "No data available in the table."
 
+@st.fragment
+def benchmark_section(merger_df: pd.DataFrame) -> None:
+    """
+    A Streamlit fragment containing the model selection and the per-selection
+    benchmarking view, so changing the model selectbox reruns only this block
+    instead of the whole dashboard page. The level selectbox lives in the sidebar
+    outside the fragment (fragments cannot write to the sidebar) and is read
+    from session state here.
+
+    Args:
+        merger_df (pd.DataFrame): The merged DataFrame of questions and model responses.
+
+    Returns:
+        None
+    """
+    selected_level = st.session_state.get("level_selector")
+
+    if selected_level:
+        st.header(f"Benchmarking on {selected_level} questions", divider="gray")
+
+        # Determine if we're using 'Overall' or a specific level
+        if selected_level == 'Overall':
+            filtered_df = merger_df
+        else:
+            level_number = selected_level.split()[-1]
+            filtered_df = merger_df[merger_df['Level'] == level_number]
+
+        # Get unique models for the selectbox
+        model_value = filtered_df['model_used'].unique()
+
+        selected_model = st.selectbox(
+            "**Select a Model:**",
+            options=model_value,
+            index=None
+        )
+
+        if selected_model:
+            st.header(f"{selected_model} Performance", divider="gray")
+            # Filter based on the selected model
+            model_selection = filtered_df[filtered_df['model_used'] == selected_model]
+
+            # Display the relevant DataFrame using your function
+            dashboard_dataframe(model_selection)
+
 st.title("Dashboard")
 
-#Joining 2 table to the validate answer 
-merger_df=pd.merge(st.session_state.data_frame,st.session_state.data_frame_dashboard,on='task_id',how='inner')
-merger_df=merger_df[['task_id','Level','Final answer','model_used','model_response','response_category']]
+# The level selectbox stays outside the fragment; sidebar widgets are not
+# supported inside fragments, and changing it reruns the full page anyway
+with st.sidebar:
+    st.selectbox(
+            "**Select a Level:**",
+            ["Overall","Level 1", "Level 2","Level 3"],
+            index=None,
+            key="level_selector",
+        )
 
-model_perf_table(merger_df)
-    
-if selected_level:
-    st.header(f"Benchmarking on {selected_level} questions", divider="gray")
-    
-    # Determine if we're using 'Overall' or a specific level
-    if selected_level == 'Overall':
-        filtered_df = merger_df
-    else:
-        level_number = selected_level.split()[-1]
-        filtered_df = merger_df[merger_df['Level'] == level_number]
+#Joining 2 table to the validate answer
+merger_df = merge_dashboard_frames(data_frame, data_frame_dashboard)
 
-    # Get unique models for the selectbox
-    model_value = filtered_df['model_used'].unique()
+model_perf_table(fetch_dashboard_aggregates())
     
-    selected_model = st.selectbox(
-        "**Select a Model:**", 
-        options=model_value,
-        index=None
-    )
-
-    if selected_model:
-        st.header(f"{selected_model} Performance", divider="gray")
-        # Filter based on the selected model
-        model_selection = filtered_df[filtered_df['model_used'] == selected_model]
-        
-        # Display the relevant DataFrame using your function
-        dashboard_dataframe(model_selection)
\ No newline at end of file
+benchmark_section(merger_df)
\ No newline at end of file
@@ -24,6 +24,17 @@ def log_success(message: str) -> None:
     """
     logger.info(message)  # Logging success messages at INFO level
 
+def log_debug(message: str, *args) -> None:
+    """
+    Logs a verbose diagnostic message at the DEBUG level. Formatting arguments are
+    passed through to the logger so the message is only built when DEBUG is enabled.
+
+    Args:
+        message (str): The debug message (or %s format string) to be logged.
+        *args: Optional values substituted into the message by the logger.
+    """
+    logger.debug(message, *args)  # Logging verbose diagnostics at DEBUG level
+
 def log_error(message: str) -> None:
     """
     Logs an error message for project events at the ERROR level.